@@ -2,17 +2,52 @@
 
 from __future__ import annotations
 
-from typing import Any
-from unittest.mock import MagicMock
+from collections.abc import Iterator
+from typing import Any, Callable
+from unittest.mock import patch
 
 import pytest
 
+from jupyter_chat_widget import ChatUI
 
-@pytest.fixture
-def mock_display(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+
+class FakeText:
+    """Minimal stand-in for ``ipywidgets.Text``.
+
+    Unlike a MagicMock, accessing an attribute the real widget doesn't
+    provide raises instead of silently succeeding.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.value = ""
+        self.disabled = False
+        self.submit_cb: Callable[..., None] | None = None
+
+    def on_submit(self, fn: Callable[..., None]) -> None:
+        self.submit_cb = fn
+
+
+class FakeOutput:
+    """Minimal stand-in for ``ipywidgets.Output``.
+
+    Entering it as a context manager and clearing it are no-ops.
+    """
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *args: Any) -> bool:
+        return False
+
+    def clear_output(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def mock_display() -> Iterator[list[Any]]:
     """Mock IPython display functions to capture displayed items.
 
-    Returns:
+    Yields:
         A list that will contain all items passed to display().
     """
     displayed_items: list[Any] = []
@@ -20,32 +55,66 @@ def mock_display(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
     def mock_display_func(*args: Any, **kwargs: Any) -> None:
         displayed_items.extend(args)
 
-    monkeypatch.setattr("IPython.display.display", mock_display_func)
-    return displayed_items
+    # Patch the name ChatUI actually calls: chat.py imports display directly,
+    # so patching IPython.display.display would not affect it.
+    patcher = patch("jupyter_chat_widget.chat.display", mock_display_func)
+    patcher.start()
+    yield displayed_items
+    patcher.stop()
 
 
-@pytest.fixture
-def mock_widgets(monkeypatch: pytest.MonkeyPatch) -> dict[str, MagicMock]:
+@pytest.fixture(scope="module")
+def mock_widgets() -> Iterator[dict[str, Any]]:
     """Mock ipywidgets to avoid requiring a Jupyter kernel.
 
-    Returns:
-        A dict containing the mock Text and Output widgets.
+    Yields:
+        A dict containing the fake Text and Output classes.
+    """
+    patcher = patch.multiple("ipywidgets", Text=FakeText, Output=FakeOutput)
+    patcher.start()
+    yield {"text": FakeText, "output": FakeOutput}
+    patcher.stop()
+
+
+@pytest.fixture(scope="module")
+def _shared_chat(mock_display: list[Any], mock_widgets: dict[str, Any]) -> ChatUI:
+    """A single ChatUI instance shared by all tests of a module."""
+    return ChatUI()
+
+
+@pytest.fixture
+def chat(_shared_chat: ChatUI, mock_display: list[Any]) -> Iterator[ChatUI]:
+    """Shared ChatUI instance, reset to its initial state.
+
+    Resetting is much cheaper than building a new widget for every test.
+    Tests that assert on what happens at construction time should use
+    ``fresh_chat`` instead.
     """
-    mock_text = MagicMock()
-    mock_text.value = ""
-    mock_text.disabled = False
+    _shared_chat.clear()
+    _shared_chat._callback = None
+    _shared_chat.escape_html = False
+    _shared_chat.text.value = ""
+    _shared_chat.text.disabled = False
+    mock_display.clear()
+    yield _shared_chat
+    # Don't leave a test's callback (or a disabled input) behind, even if
+    # the test failed halfway through a submission.
+    _shared_chat._callback = None
+    _shared_chat.text.disabled = False
 
-    mock_output = MagicMock()
-    mock_output.__enter__ = MagicMock(return_value=None)
-    mock_output.__exit__ = MagicMock(return_value=None)
 
-    def create_text(**kwargs: Any) -> MagicMock:
-        return mock_text
+@pytest.fixture
+def fresh_chat(mock_display: list[Any], mock_widgets: dict[str, Any]) -> ChatUI:
+    """A newly constructed ChatUI instance."""
+    return ChatUI()
 
-    def create_output(**kwargs: Any) -> MagicMock:
-        return MagicMock()
 
-    monkeypatch.setattr("ipywidgets.Text", create_text)
-    monkeypatch.setattr("ipywidgets.Output", create_output)
+@pytest.fixture(autouse=True)
+def reset_mocks(request: pytest.FixtureRequest) -> None:
+    """Reset the shared mock state before each test.
 
-    return {"text": mock_text, "output": mock_output}
+    Only touches fixtures the test already requested, so tests that don't
+    need the mocks never trigger their setup.
+    """
+    if "mock_display" in request.fixturenames:
+        request.getfixturevalue("mock_display").clear()
@@ -2,108 +2,129 @@
 
 from __future__ import annotations
 
+import re
+
 import pytest
 
 from jupyter_chat_widget import ChatUI, __version__
+from jupyter_chat_widget.chat import MessageCallback
+
+_SEMVER = re.compile(r"^\d+\.\d+(?:\.\d+)?(?:[.\-+].*)?$")
+
+# Matches the markup _render_live_html wraps around the response text.
+_WRAPPER_RE = re.compile(r"^<p [^>]*><b [^>]*>assistant:</b> | </p>$")
+
+# (input text, expected escaped text) pairs for escape_html=True.
+_ESCAPE_CASES = [
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ("&", "&amp;"),
+    ("<>&", "&lt;&gt;&amp;"),
+    ("a < b > c & d", "a &lt; b &gt; c &amp; d"),
+    (
+        "<script>alert('xss')</script>",
+        "&lt;script&gt;alert('xss')&lt;/script&gt;",
+    ),
+    ("line 1\nline 2", "line 1<br>line 2"),
+]
+
+
+def _first_callback(msg: str) -> None:
+    pass
+
+
+def _second_callback(msg: str) -> None:
+    pass
+
+
+# Messages passed to _record, cleared before each test.
+received: list[str] = []
+
+
+def _record(msg: str) -> None:
+    received.append(msg)
+
+
+@pytest.fixture(autouse=True)
+def _clear_received() -> None:
+    received.clear()
 
 
 class TestVersion:
     """Tests for package version."""
 
-    def test_version_is_string(self) -> None:
-        """Test that version is a string."""
-        assert isinstance(__version__, str)
-
     def test_version_format(self) -> None:
         """Test that version follows semver format."""
-        parts = __version__.split(".")
-        assert len(parts) >= 2
-        assert all(part.isdigit() for part in parts[:2])
+        assert _SEMVER.match(__version__)
 
 
 class TestChatUIInit:
     """Tests for ChatUI initialization."""
 
-    def test_init_creates_widgets(self, mock_display: list) -> None:
+    def test_init_creates_widgets(self, fresh_chat: ChatUI) -> None:
         """Test that initialization creates the required widgets."""
-        chat = ChatUI()
-
-        assert chat.text is not None
-        assert chat.chat_out is not None
-        assert chat.response_out is not None
+        assert fresh_chat.text is not None
+        assert fresh_chat.chat_out is not None
+        assert fresh_chat.response_out is not None
 
-    def test_init_sets_default_state(self, mock_display: list) -> None:
+    def test_init_sets_default_state(self, fresh_chat: ChatUI) -> None:
         """Test that initialization sets correct default state."""
-        chat = ChatUI()
+        assert fresh_chat._live_response == ""
+        assert fresh_chat._has_live_response is False
+        assert fresh_chat._callback is None
 
-        assert chat._live_response == ""
-        assert chat._has_live_response is False
-        assert chat._callback is None
-
-    def test_init_displays_widgets(self, mock_display: list) -> None:
-        """Test that widgets are displayed on init."""
-        ChatUI()
+    def test_init_wires_submit_handler(self, fresh_chat: ChatUI) -> None:
+        """Test that submitting the text input calls _on_submit."""
+        assert fresh_chat.text.submit_cb == fresh_chat._on_submit
 
-        # The mock captures display calls - verify it was called
-        # (actual count depends on implementation details)
-        assert mock_display is not None
+    def test_init_displays_widgets(
+        self, mock_display: list, fresh_chat: ChatUI
+    ) -> None:
+        """Test that the output areas and the input are displayed on init."""
+        assert mock_display == [
+            fresh_chat.chat_out,
+            fresh_chat.response_out,
+            fresh_chat.text,
+        ]
 
 
 class TestConnect:
     """Tests for connect() method."""
 
-    def test_connect_sets_callback(self, mock_display: list) -> None:
-        """Test that connect() properly sets the callback."""
-        chat = ChatUI()
-        callback_called: list[str] = []
-
-        def my_callback(msg: str) -> None:
-            callback_called.append(msg)
-
-        chat.connect(my_callback)
-        assert chat._callback is my_callback
-
-    def test_connect_replaces_callback(self, mock_display: list) -> None:
-        """Test that connect() replaces existing callback."""
-        chat = ChatUI()
-
-        def first_callback(msg: str) -> None:
-            pass
-
-        def second_callback(msg: str) -> None:
-            pass
-
-        chat.connect(first_callback)
-        chat.connect(second_callback)
+    @pytest.mark.parametrize(
+        "callbacks",
+        [[_first_callback], [_first_callback, _second_callback]],
+        ids=["sets", "replaces"],
+    )
+    def test_connect_sets_last_callback(
+        self, chat: ChatUI, callbacks: list[MessageCallback]
+    ) -> None:
+        """Test that connect() sets the callback, replacing any existing one."""
+        for callback in callbacks:
+            chat.connect(callback)
 
-        assert chat._callback is second_callback
+        assert chat._callback is callbacks[-1]
 
 
 class TestAppend:
     """Tests for append() method."""
 
-    def test_append_updates_response(self, mock_display: list) -> None:
+    def test_append_updates_response(self, chat: ChatUI) -> None:
         """Test that append() adds to the live response."""
-        chat = ChatUI()
-
         chat.append("Hello")
         assert chat._live_response == "Hello"
         assert chat._has_live_response is True
 
-    def test_append_accumulates(self, mock_display: list) -> None:
+    def test_append_accumulates(self, chat: ChatUI) -> None:
         """Test that multiple appends accumulate."""
-        chat = ChatUI()
-
         chat.append("Hello")
         chat.append(" ")
         chat.append("World")
 
         assert chat._live_response == "Hello World"
 
-    def test_append_sets_has_live_response(self, mock_display: list) -> None:
+    def test_append_sets_has_live_response(self, chat: ChatUI) -> None:
         """Test that append sets the live response flag."""
-        chat = ChatUI()
-
         assert chat._has_live_response is False
         chat.append("test")
         assert chat._has_live_response is True
@@ -112,20 +133,16 @@ class TestAppend:
 class TestRewrite:
     """Tests for rewrite() method."""
 
-    def test_rewrite_replaces_response(self, mock_display: list) -> None:
+    def test_rewrite_replaces_response(self, chat: ChatUI) -> None:
         """Test that rewrite() replaces the live response."""
-        chat = ChatUI()
-
         chat.append("First")
         chat.rewrite("Second")
 
         assert chat._live_response == "Second"
         assert chat._has_live_response is True
 
-    def test_rewrite_on_empty(self, mock_display: list) -> None:
+    def test_rewrite_on_empty(self, chat: ChatUI) -> None:
         """Test that rewrite() works on empty response."""
-        chat = ChatUI()
-
         chat.rewrite("New text")
 
         assert chat._live_response == "New text"
@@ -135,19 +152,16 @@ class TestRewrite:
 class TestClear:
     """Tests for clear() method."""
 
-    def test_clear_resets_state(self, mock_display: list) -> None:
+    def test_clear_resets_state(self, chat: ChatUI) -> None:
         """Test that clear() resets the chat state."""
-        chat = ChatUI()
-
         chat.append("Some text")
         chat.clear()
 
         assert chat._live_response == ""
         assert chat._has_live_response is False
 
-    def test_clear_on_empty(self, mock_display: list) -> None:
+    def test_clear_on_empty(self, chat: ChatUI) -> None:
         """Test that clear() works on already empty state."""
-        chat = ChatUI()
         chat.clear()
 
         assert chat._live_response == ""
@@ -157,58 +171,17 @@ class TestClear:
 class TestHtmlRendering:
     """Tests for HTML rendering and escaping."""
 
-    def test_render_escapes_less_than(self, mock_display: list) -> None:
-        """Test that < is escaped when escape_html=True."""
-        import re
-
-        chat = ChatUI(escape_html=True)
-        html = chat._render_live_html("<")
-        assert "&lt;" in html
-        # Strip all HTML tags and check no unescaped < remains
-        text_only = re.sub(r"<[^>]+>", "", html.replace("&lt;", ""))
-        assert "<" not in text_only
-
-    def test_render_escapes_greater_than(self, mock_display: list) -> None:
-        """Test that > is escaped when escape_html=True."""
-        chat = ChatUI(escape_html=True)
-        html = chat._render_live_html(">")
-        assert "&gt;" in html
-
-    def test_render_escapes_ampersand(self, mock_display: list) -> None:
-        """Test that & is escaped when escape_html=True."""
-        chat = ChatUI(escape_html=True)
-        html = chat._render_live_html("&")
-        assert "&amp;" in html
-
-    def test_render_escapes_script_tag(self, mock_display: list) -> None:
-        """Test that script tags are properly escaped (XSS prevention) when escape_html=True."""
-        chat = ChatUI(escape_html=True)
-        html = chat._render_live_html("<script>alert('xss')</script>")
-
-        assert "<script>" not in html
-        assert "&lt;script&gt;" in html
-
-    @pytest.mark.parametrize(
-        "input_text,expected_escaped",
-        [
-            ("<", "&lt;"),
-            (">", "&gt;"),
-            ("&", "&amp;"),
-            ("<>&", "&lt;&gt;&amp;"),
-            ("a < b > c & d", "a &lt; b &gt; c &amp; d"),
-        ],
-    )
+    @pytest.mark.parametrize("input_text,expected_escaped", _ESCAPE_CASES)
     def test_html_escaping_parametrized(
-        self, mock_display: list, input_text: str, expected_escaped: str
+        self, chat: ChatUI, input_text: str, expected_escaped: str
     ) -> None:
         """Test various HTML escape scenarios when escape_html=True."""
-        chat = ChatUI(escape_html=True)
+        chat.escape_html = True
         html = chat._render_live_html(input_text)
-        assert expected_escaped in html
+        assert _WRAPPER_RE.sub("", html) == expected_escaped
 
-    def test_render_includes_assistant_label(self, mock_display: list) -> None:
+    def test_render_includes_assistant_label(self, chat: ChatUI) -> None:
         """Test that rendered HTML includes assistant label."""
-        chat = ChatUI()
         html = chat._render_live_html("test")
         assert "assistant:" in html
 
@@ -216,19 +189,16 @@ class TestHtmlRendering:
 class TestCommitLiveToChat:
     """Tests for _commit_live_to_chat() method."""
 
-    def test_commit_clears_response(self, mock_display: list) -> None:
+    def test_commit_clears_response(self, chat: ChatUI) -> None:
         """Test that committing clears the live response."""
-        chat = ChatUI()
-
         chat.append("Test message")
         chat._commit_live_to_chat()
 
         assert chat._live_response == ""
         assert chat._has_live_response is False
 
-    def test_commit_does_nothing_when_empty(self, mock_display: list) -> None:
+    def test_commit_does_nothing_when_empty(self, chat: ChatUI) -> None:
         """Test that commit on empty response doesn't error."""
-        chat = ChatUI()
         chat._commit_live_to_chat()
 
         assert chat._live_response == ""
@@ -238,27 +208,21 @@ class TestCommitLiveToChat:
 class TestOnSubmit:
     """Tests for submission handling."""
 
-    def test_callback_receives_message(self, mock_display: list) -> None:
+    def test_callback_receives_message(self, chat: ChatUI) -> None:
         """Test that callback receives the submitted message."""
-        chat = ChatUI()
-        received_messages: list[str] = []
-
-        def callback(msg: str) -> None:
-            received_messages.append(msg)
-
-        chat.connect(callback)
+        chat.connect(_record)
         chat.text.value = "Hello"
         chat._on_submit(chat.text)
 
-        assert received_messages == ["Hello"]
+        assert received == ["Hello"]
 
-    def test_callback_exception_reenables_input(self, mock_display: list) -> None:
+    def test_callback_exception_reenables_input(self, chat: ChatUI) -> None:
         """Test that input is re-enabled even if callback raises."""
-        chat = ChatUI()
 
         def failing_callback(msg: str) -> None:
             raise ValueError("Test error")
 
+        chat.text.disabled = False
         chat.connect(failing_callback)
         chat.text.value = "test"
 
@@ -268,23 +232,16 @@ class TestOnSubmit:
         # Input should be re-enabled despite exception
         assert chat.text.disabled is False
 
-    def test_no_callback_doesnt_error(self, mock_display: list) -> None:
+    def test_no_callback_doesnt_error(self, chat: ChatUI) -> None:
         """Test that submitting without a callback doesn't raise."""
-        chat = ChatUI()
         chat.text.value = "test"
         chat._on_submit(chat.text)  # Should not raise
 
-    def test_empty_message_does_nothing(self, mock_display: list) -> None:
+    def test_empty_message_does_nothing(self, chat: ChatUI) -> None:
         """Test that submitting an empty message does nothing."""
-        chat = ChatUI()
-        callback_called: list[str] = []
-
-        def callback(msg: str) -> None:
-            callback_called.append(msg)
-
-        chat.connect(callback)
+        chat.connect(_record)
         chat.text.value = ""
         chat._on_submit(chat.text)
 
-        assert callback_called == []
+        assert received == []
         assert chat.text.disabled is False